@@ -1,13 +1,16 @@
 import re
 import os
+import stat
+import mmap
 import html
 import json
 import csv
 import argparse
 import sys
-from datetime import datetime
+from datetime import datetime, time
 from collections import Counter, defaultdict
-from typing import Dict, List, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Tuple, Optional
 
 try:
     from tqdm import tqdm
@@ -16,27 +19,141 @@ except ImportError:
     HAS_TQDM = False
     print("Note: Install 'tqdm' for better progress bars: pip install tqdm")
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+cached_escape = lru_cache(maxsize=2048)(html.escape)
+
+WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+WRITE_BUFFER = 1 << 20
+
+EXPORT_METHODS = {
+    'txt': 'export_txt',
+    'json': 'export_json',
+    'csv': 'export_csv',
+    'md': 'export_markdown',
+    'html': 'export_html'
+}
+
+VALID_FORMATS = frozenset(EXPORT_METHODS)
+
+HTML_HEAD_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <title>Discord Archive - {username}</title>
+    <style>
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            background-color: #36393f;
+            color: #dcddde;
+            padding: 20px;
+            max-width: 1200px;
+            margin: 0 auto;
+        }}
+        .header {{
+            background-color: #2f3136;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+        }}
+        .stats {{
+            background-color: #2f3136;
+            padding: 20px;
+            border-radius: 8px;
+            margin-bottom: 20px;
+        }}
+        .message {{
+            background-color: #2f3136;
+            padding: 15px;
+            border-radius: 8px;
+            margin-bottom: 10px;
+            border-left: 3px solid {user_color};
+        }}
+        .context {{
+            background-color: #202225;
+            padding: 10px;
+            border-radius: 4px;
+            margin-bottom: 10px;
+            border-left: 2px solid #7289da;
+        }}
+        .timestamp {{
+            color: #72767d;
+            font-size: 0.9em;
+        }}
+        .username {{
+            color: {user_color};
+            font-weight: bold;
+        }}
+        h1, h2 {{
+            color: #fff;
+        }}
+        .stat-item {{
+            margin: 10px 0;
+        }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>Discord Message Archive</h1>
+        <p><strong>User ID:</strong> {user_id}</p>
+        <p><strong>Username:</strong> {username}</p>
+        <p><strong>Messages:</strong> {message_count}</p>
+        <p><strong>Date Range:</strong> {date_range}</p>
+    </div>
+    
+    {stats_html}
+    
+    <h2>Messages</h2>
+    """
+
+HTML_TAIL = """
+</body>
+</html>
+"""
+
+class Message(NamedTuple):
+    user_id: str
+    username: str
+    color: Optional[str]
+    content: str
+    timestamp: str
+    reply_to_msg_id: Optional[str]
+    message_id: str
+    dt: Optional[datetime]
+
+
 class DiscordExtractor:
     def __init__(self, input_file: str, target_user_ids: List[str], 
-                 date_from: Optional[str] = None, date_to: Optional[str] = None,
-                 search_term: Optional[str] = None, exclude_replies: bool = False):
+                 date_from: Optional[datetime] = None, date_to: Optional[datetime] = None,
+                 search_term: Optional[str] = None, exclude_replies: bool = False,
+                 strict_html: bool = False, input_size: Optional[int] = None):
         self.input_file = input_file
         self.target_user_ids = target_user_ids
+        self._target_ids = frozenset(target_user_ids)
         self.date_from = date_from
         self.date_to = date_to
         self.search_term = search_term.lower() if search_term else None
         self.exclude_replies = exclude_replies
+        self.strict_html = strict_html
+        self.input_size = input_size
         
-        self.group_start_re = re.compile(r'<div\s+class\s*=\s*chatlog__message-group', re.IGNORECASE)
-        self.container_re = re.compile(
-            r'<div\s+id\s*=\s*chatlog__message-container[^>]*>(.*?)(?=(?:<div\s+id\s*=\s*chatlog__message-container)|$)',
-            re.IGNORECASE | re.DOTALL
-        )
+        self.group_marker = b'<div class=chatlog__message-group'
+        self.container_marker = b'<div id=chatlog__message-container'
+        self.group_start_re = re.compile(rb'<div\s+class\s*=\s*["\']?chatlog__message-group', re.IGNORECASE)
+        self.container_start_re = re.compile(rb'<div\s+id\s*=\s*chatlog__message-container', re.IGNORECASE)
         self.author_re = re.compile(r'<span\s+class\s*=\s*chatlog__author[^>]*data-user-id\s*=\s*(\d+)[^>]*>(.*?)</span>', re.IGNORECASE | re.DOTALL)
         self.color_re = re.compile(r'style\s*=\s*color\s*:\s*([^ >;"]+)', re.IGNORECASE)
-        self.full_ts_re = re.compile(r'<span\s+class\s*=\s*chatlog__timestamp[^>]*>.*?<a[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
-        self.title_ts_re = re.compile(r'<span\s+class\s*=\s*chatlog__timestamp[^>]*title\s*=\s*["\'](.*?)["\']', re.IGNORECASE | re.DOTALL)
-        self.short_ts_re = re.compile(r'<div\s+class\s*=\s*chatlog__short-timestamp[^>]*>(.*?)</div>', re.IGNORECASE | re.DOTALL)
+        self.timestamp_re = re.compile(
+            r'<span\s+class\s*=\s*chatlog__timestamp(?:[^>]*title\s*=\s*["\'](?P<title>.*?)["\'])?[^>]*>(?:.*?<a[^>]*>(?P<full>.*?)</a>)?'
+            r'|<div\s+class\s*=\s*chatlog__short-timestamp[^>]*>(?P<short>.*?)</div>',
+            re.IGNORECASE | re.DOTALL
+        )
         self.inner_span_re = re.compile(r'<span\s+class\s*=\s*chatlog__markdown-preserve[^>]*>(.*?)</span>', re.IGNORECASE | re.DOTALL)
         self.content_div_re = re.compile(r'<div\s+class\s*=\s*(?:"|\')?chatlog__content[^>]*>(.*?)</div>', re.IGNORECASE | re.DOTALL)
         self.attachment_href_re = re.compile(r'<a\s+[^>]*href\s*=\s*["\']([^"\']+)["\'][^>]*>', re.IGNORECASE)
@@ -48,27 +165,58 @@ class DiscordExtractor:
         self.tag_strip_re = re.compile(r'<[^>]+>')
         
         self.all_messages = {}
+        self.messages_by_user = defaultdict(list)
+        self._reply_chain_cache = {}
+        self.user_messages = {}
         self.user_data = {}
         self.statistics = {}
-        self.timestamp_formats = [
-            "%m/%d/%Y %I:%M %p",
-            "%m/%d/%Y %H:%M",
-            "%Y-%m-%d %H:%M:%S",
-        ]
         
     def strip_tags(self, s: str) -> str:
+        if '<' not in s:
+            return s
         return self.tag_strip_re.sub('', s)
     
     def normalize_spaces(self, s: str) -> str:
-        return (s or "").replace('\u202f', ' ').replace('\xa0', ' ').replace('\u2009', ' ').strip()
+        if not s:
+            return ""
+        if s.isascii():
+            return s.strip()
+        return s.replace('\u202f', ' ').replace('\xa0', ' ').replace('\u2009', ' ').strip()
     
-    def parse_timestamp(self, ts_str: str) -> Optional[datetime]:
-        for fmt in self.timestamp_formats:
-            try:
-                return datetime.strptime(ts_str, fmt)
-            except:
-                continue
-        return None
+    @staticmethod
+    def parse_timestamp(ts_str: str) -> Optional[datetime]:
+        if '/' in ts_str:
+            fmt = "%m/%d/%Y %I:%M %p" if ts_str[-2:].upper() in ('AM', 'PM') else "%m/%d/%Y %H:%M"
+        else:
+            fmt = "%Y-%m-%d %H:%M:%S"
+        try:
+            return datetime.strptime(ts_str, fmt)
+        except ValueError:
+            return None
+    
+    @staticmethod
+    def parse_date_bound(value: str, end_of_day: bool = False) -> Optional[datetime]:
+        dt = DiscordExtractor.parse_timestamp(value)
+        if dt:
+            return dt
+        try:
+            dt = datetime.strptime(value.strip(), "%m/%d/%Y")
+        except ValueError:
+            return None
+        return datetime.combine(dt.date(), time.max) if end_of_day else dt
+    
+    def find_group_start(self, mm, pos: int) -> int:
+        if self.strict_html:
+            m = self.group_start_re.search(mm, pos)
+            return m.start() if m else -1
+        
+        return mm.find(self.group_marker, pos)
+    
+    def find_container_start(self, mm, pos: int) -> int:
+        if self.strict_html:
+            m = self.container_start_re.search(mm, pos)
+            return m.start() if m else -1
+        return mm.find(self.container_marker, pos)
     
     def update_progress(self, pbar, amount):
         if HAS_TQDM and pbar:
@@ -77,7 +225,7 @@ class DiscordExtractor:
     def extract_all_messages(self):
         print("PASS 1: Collecting all messages...")
         
-        total_bytes = os.path.getsize(self.input_file)
+        total_bytes = self.input_size if self.input_size is not None else os.path.getsize(self.input_file)
         groups_seen = 0
         containers_seen = 0
         
@@ -86,18 +234,15 @@ class DiscordExtractor:
         prev_author_name = None
         prev_author_color = None
         
-        group_buf = []
-        in_group = False
-        
         pbar = tqdm(total=total_bytes, unit='B', unit_scale=True, desc="Reading") if HAS_TQDM else None
         
-        def process_container(cont, cont_match):
+        def process_container(cont):
             nonlocal prev_author_id, prev_author_name, prev_author_color
             nonlocal last_full_date, containers_seen
             
             containers_seen += 1
             
-            msg_id_match = self.message_id_re.search(cont_match.group(0))
+            msg_id_match = self.message_id_re.match(cont)
             current_msg_id = msg_id_match.group(1) if msg_id_match else None
             
             if not current_msg_id:
@@ -113,7 +258,7 @@ class DiscordExtractor:
             
             a = self.author_re.search(cont)
             if a:
-                prev_author_id = a.group(1).strip()
+                prev_author_id = sys.intern(a.group(1).strip())
                 prev_author_name = self.strip_tags(a.group(2)).strip() if a.group(2) else None
                 c = self.color_re.search(cont)
                 if c:
@@ -123,10 +268,9 @@ class DiscordExtractor:
             author_name = prev_author_name or "Unknown"
             
             ts = None
-            t_full = self.full_ts_re.search(cont)
-            t_title = self.title_ts_re.search(cont)
-            if t_full:
-                ts_raw = self.normalize_spaces(self.strip_tags(t_full.group(1)))
+            t = self.timestamp_re.search(cont)
+            if t and t.group('full') is not None:
+                ts_raw = self.normalize_spaces(self.strip_tags(t.group('full')))
                 ts = ts_raw
                 parts = ts_raw.split()
                 date_part = None
@@ -136,17 +280,15 @@ class DiscordExtractor:
                         break
                 if date_part:
                     last_full_date = date_part
-            elif t_title:
-                ts_raw = self.normalize_spaces(self.strip_tags(t_title.group(1)))
+            elif t and t.group('title') is not None:
+                ts_raw = self.normalize_spaces(self.strip_tags(t.group('title')))
                 ts = ts_raw
-            else:
-                short_ts = self.short_ts_re.search(cont)
-                if short_ts:
-                    st = self.normalize_spaces(self.strip_tags(short_ts.group(1)))
-                    if last_full_date:
-                        ts = f"{last_full_date} {st}"
-                    else:
-                        ts = st
+            elif t and t.group('short') is not None:
+                st = self.normalize_spaces(self.strip_tags(t.group('short')))
+                if last_full_date:
+                    ts = f"{last_full_date} {st}"
+                else:
+                    ts = st
             
             content_raw = ""
             m = self.inner_span_re.search(cont)
@@ -177,70 +319,78 @@ class DiscordExtractor:
             
             content_text = html.unescape(content_text)
             
-            self.all_messages[current_msg_id] = {
-                'user_id': author_id,
-                'username': author_name,
-                'color': prev_author_color,
-                'content': content_text,
-                'timestamp': ts or "UNKNOWN_TIMESTAMP",
-                'reply_to_msg_id': reply_msg_id,
-                'message_id': current_msg_id
-            }
-        
-        def process_group(group_text):
-            nonlocal groups_seen
-            groups_seen += 1
-            
-            for cont_match in self.container_re.finditer(group_text):
-                process_container(cont_match.group(1), cont_match)
-        
-        with open(self.input_file, "r", encoding="utf-8", errors="ignore") as infile:
-            while True:
-                line = infile.readline()
-                if not line:
-                    if in_group and group_buf:
-                        process_group(''.join(group_buf))
-                    break
-                
-                self.update_progress(pbar, len(line.encode('utf-8')))
-                
-                if self.group_start_re.search(line):
-                    if in_group and group_buf:
-                        process_group(''.join(group_buf))
-                        group_buf = []
-                    in_group = True
-                
-                if in_group:
-                    group_buf.append(line)
+            is_target = author_id in self._target_ids
+            msg = Message(
+                user_id=author_id,
+                username=author_name,
+                color=prev_author_color,
+                content=content_text,
+                timestamp=ts or "UNKNOWN_TIMESTAMP",
+                reply_to_msg_id=reply_msg_id,
+                message_id=current_msg_id,
+                dt=self.parse_timestamp(ts) if ts and is_target else None
+            )
+            if is_target and current_msg_id not in self.all_messages:
+                self.messages_by_user[author_id].append(msg)
+            self.all_messages[current_msg_id] = msg
+        
+        with open(self.input_file, "rb") as infile:
+            if total_bytes:
+                with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    next_group = self.find_group_start(mm, 0)
+                    start = self.find_container_start(mm, next_group) if next_group != -1 else -1
+                    done = 0
+                    
+                    while start != -1:
+                        while next_group != -1 and next_group <= start:
+                            groups_seen += 1
+                            next_group = self.find_group_start(mm, next_group + 1)
+                        
+                        end = self.find_container_start(mm, start + 1)
+                        stop = end if end != -1 else total_bytes
+                        cont = mm[start:stop].decode('utf-8', 'ignore')
+                        if '\r' in cont:
+                            cont = cont.replace('\r\n', '\n').replace('\r', '\n')
+                        process_container(cont)
+                        
+                        self.update_progress(pbar, stop - done)
+                        done = stop
+                        start = end
+                    
+                    while next_group != -1:
+                        groups_seen += 1
+                        next_group = self.find_group_start(mm, next_group + 1)
+                    
+                    self.update_progress(pbar, total_bytes - done)
         
         if pbar:
             pbar.close()
         
         print(f"✓ Collected {len(self.all_messages):,} total messages from {groups_seen:,} groups")
+        if not self.all_messages and not self.strict_html:
+            print("⚠ No messages found with exact DiscordChatExporter markup; retry with --strict-html if the export uses non-standard spacing, casing or quoting")
     
-    def should_include_message(self, msg: Dict) -> bool:
-        if self.exclude_replies and msg['reply_to_msg_id']:
-            return False
-        
-        if self.search_term and self.search_term not in msg['content'].lower():
+    def should_include_message(self, msg: Message) -> bool:
+        if self.exclude_replies and msg.reply_to_msg_id:
             return False
         
         if self.date_from or self.date_to:
-            dt = self.parse_timestamp(msg['timestamp'])
+            dt = msg.dt
             if dt:
-                if self.date_from:
-                    from_dt = self.parse_timestamp(self.date_from)
-                    if from_dt and dt < from_dt:
-                        return False
-                if self.date_to:
-                    to_dt = self.parse_timestamp(self.date_to)
-                    if to_dt and dt > to_dt:
-                        return False
+                if self.date_from and dt < self.date_from:
+                    return False
+                if self.date_to and dt > self.date_to:
+                    return False
+        
+        if self.search_term and self.search_term not in msg.content.lower():
+            return False
         
         return True
     
-    def filter_and_extract_users(self):
-        print("\nPASS 2: Filtering and extracting target user messages...")
+    def build_user_data_and_stats(self):
+        print("\nPASS 2: Filtering target user messages and calculating statistics...")
         
         for user_id in self.target_user_ids:
             messages = []
@@ -250,195 +400,202 @@ class DiscordExtractor:
             username = None
             color = None
             
-            for msg_id, msg in self.all_messages.items():
-                if msg['user_id'] != user_id:
-                    continue
-                
+            reply_count = 0
+            total_words = 0
+            hour_distribution = Counter()
+            day_distribution = Counter()
+            reply_depth_total = 0
+            reply_depth_count = 0
+            
+            for msg in self.messages_by_user.get(user_id, ()):
                 if not self.should_include_message(msg):
                     continue
                 
                 if not username:
-                    username = msg['username']
-                    color = msg['color']
-                    first_timestamp = msg['timestamp']
+                    username = msg.username
+                    color = msg.color
+                    first_timestamp = msg.timestamp
                 
-                last_timestamp = msg['timestamp']
+                last_timestamp = msg.timestamp
                 
-                reply_chain_ids = []
-                if msg['reply_to_msg_id'] and msg['reply_to_msg_id'] in self.all_messages:
-                    replied_msg = self.all_messages[msg['reply_to_msg_id']]
-                    reply_user_id = replied_msg['user_id']
+                reply_chain_ids = ()
+                if msg.reply_to_msg_id and msg.reply_to_msg_id in self.all_messages:
+                    replied_msg = self.all_messages[msg.reply_to_msg_id]
+                    reply_user_id = replied_msg.user_id
                     
                     if reply_user_id != user_id:
                         if reply_user_id not in replied_to_users:
-                            replied_to_users[reply_user_id] = (replied_msg['username'], 0)
-                        replied_to_users[reply_user_id] = (replied_msg['username'], replied_to_users[reply_user_id][1] + 1)
+                            replied_to_users[reply_user_id] = (replied_msg.username, 0)
+                        replied_to_users[reply_user_id] = (replied_msg.username, replied_to_users[reply_user_id][1] + 1)
                     
-                    reply_chain_ids = self.build_reply_chain_ids(msg['reply_to_msg_id'])
+                    reply_chain_ids = self.build_reply_chain_ids(msg.reply_to_msg_id)
                 
                 messages.append({
-                    'timestamp': msg['timestamp'],
-                    'content': msg['content'],
-                    'reply_to_msg_id': msg['reply_to_msg_id'],
+                    'timestamp': msg.timestamp,
+                    'content': msg.content,
+                    'reply_to_msg_id': msg.reply_to_msg_id,
                     'reply_chain_ids': reply_chain_ids,
-                    'message_id': msg_id
+                    'message_id': msg.message_id
                 })
+                
+                if msg.reply_to_msg_id:
+                    reply_count += 1
+                if not msg.content.startswith('['):
+                    total_words += len(msg.content.split())
+                dt = msg.dt
+                if dt:
+                    hour_distribution[dt.hour] += 1
+                    day_distribution[WEEKDAYS[dt.weekday()]] += 1
+                if reply_chain_ids:
+                    reply_depth_total += len(reply_chain_ids)
+                    reply_depth_count += 1
             
+            self.user_messages[user_id] = messages
             self.user_data[user_id] = {
                 'username': username or 'Unknown',
                 'color': color or 'N/A',
-                'messages': messages,
+                'message_count': len(messages),
                 'replied_to_users': replied_to_users,
                 'first_timestamp': first_timestamp,
                 'last_timestamp': last_timestamp
             }
             
+            if messages:
+                total_messages = len(messages)
+                
+                self.statistics[user_id] = {
+                    'total_messages': total_messages,
+                    'original_messages': total_messages - reply_count,
+                    'replies': reply_count,
+                    'total_words': total_words,
+                    'avg_message_length': total_words / total_messages,
+                    'most_active_hour': hour_distribution.most_common(1)[0] if hour_distribution else None,
+                    'most_active_day': day_distribution.most_common(1)[0] if day_distribution else None,
+                    'avg_reply_depth': reply_depth_total / reply_depth_count if reply_depth_count else 0,
+                    'hour_distribution': dict(hour_distribution),
+                    'day_distribution': dict(day_distribution)
+                }
+            
             print(f"✓ User {username} ({user_id}): {len(messages):,} messages")
     
-    def build_reply_chain_ids(self, msg_id: str, max_depth: int = 5) -> List[str]:
+    def build_reply_chain_ids(self, msg_id: str, max_depth: int = 5) -> Tuple[str, ...]:
+        cached = self._reply_chain_cache.get((msg_id, max_depth))
+        if cached is not None:
+            return cached
+        
         chain = []
         current_id = msg_id
-        depth = 0
         
-        while current_id and current_id in self.all_messages and depth < max_depth:
+        while current_id and current_id in self.all_messages and len(chain) < max_depth:
+            ancestors = self._reply_chain_cache.get((current_id, max_depth))
+            if ancestors is not None:
+                chain.extend(ancestors[:max_depth - len(chain)])
+                break
             chain.append(current_id)
-            current_id = self.all_messages[current_id]['reply_to_msg_id']
-            depth += 1
+            current_id = self.all_messages[current_id].reply_to_msg_id
         
+        chain = tuple(chain)
+        self._reply_chain_cache[(msg_id, max_depth)] = chain
         return chain
     
-    def calculate_statistics(self):
-        print("\nPASS 3: Calculating statistics...")
-        
-        for user_id, data in self.user_data.items():
-            messages = data['messages']
-            
-            if not messages:
-                continue
-            
-            total_messages = len(messages)
-            reply_count = sum(1 for m in messages if m['reply_to_msg_id'])
-            original_count = total_messages - reply_count
-            
-            all_text = ' '.join(
-                self.all_messages[m['message_id']]['content'] 
-                for m in messages 
-                if not self.all_messages[m['message_id']]['content'].startswith('[')
-            )
-            words = all_text.split()
-            total_words = len(words)
-            avg_length = total_words / total_messages if total_messages > 0 else 0
-
-            timestamps_parsed = []
-            for m in messages:
-                dt = self.parse_timestamp(m['timestamp'])
-                if dt:
-                    timestamps_parsed.append(dt)
-            
-            hour_distribution = Counter(dt.hour for dt in timestamps_parsed)
-            day_distribution = Counter(dt.strftime('%A') for dt in timestamps_parsed)
-            
-            reply_depth = [len(m['reply_chain_ids']) for m in messages if m['reply_chain_ids']]
-            avg_reply_depth = sum(reply_depth) / len(reply_depth) if reply_depth else 0
-            
-            self.statistics[user_id] = {
-                'total_messages': total_messages,
-                'original_messages': original_count,
-                'replies': reply_count,
-                'total_words': total_words,
-                'avg_message_length': avg_length,
-                'most_active_hour': hour_distribution.most_common(1)[0] if hour_distribution else None,
-                'most_active_day': day_distribution.most_common(1)[0] if day_distribution else None,
-                'avg_reply_depth': avg_reply_depth,
-                'hour_distribution': dict(hour_distribution),
-                'day_distribution': dict(day_distribution)
-            }
-    
     def get_output_path(self, prefix: str, username: str, user_id: str, ext: str) -> str:
         return f"{prefix}_{username}_{user_id}.{ext}"
     
-    def format_date_range(self, first_ts: str, last_ts: str) -> str:
+    @staticmethod
+    def format_date_range(first_ts: str, last_ts: str) -> str:
         if first_ts and last_ts:
             return f"{first_ts} → {last_ts}"
         return "N/A"
     
-    def get_reply_message(self, msg_id: str) -> Optional[Dict]:
+    def get_reply_message(self, msg_id: str) -> Optional[Message]:
         return self.all_messages.get(msg_id)
     
-    def export_txt(self, output_file: str, user_id: str):
-        data = self.user_data[user_id]
-        stats = self.statistics.get(user_id, {})
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write("=" * 60 + "\n")
-            f.write("Discord Message Archive\n")
-            f.write("=" * 60 + "\n")
-            f.write(f"User ID   : {user_id}\n")
-            f.write(f"Username  : {data['username']}\n")
-            f.write(f"Color     : {data['color']}\n")
-            f.write(f"Messages  : {len(data['messages']):,}\n")
-            date_range = self.format_date_range(data['first_timestamp'], data['last_timestamp'])
-            if date_range != "N/A":
-                f.write(f"Range     : {date_range}\n")
-            
-            if data['replied_to_users']:
-                f.write("\n" + "-" * 60 + "\n")
-                f.write("Reply Summary\n")
-                f.write("-" * 60 + "\n")
-                f.write(f"Replied to {len(data['replied_to_users'])} unique user(s):\n")
-                sorted_replies = sorted(data['replied_to_users'].items(), key=lambda x: x[1][1], reverse=True)
-                for uid, (uname, count) in sorted_replies[:10]:
-                    f.write(f"  • {uname} (ID: {uid}): {count} time{'s' if count != 1 else ''}\n")
-            
-            if stats:
-                f.write("\n" + "-" * 60 + "\n")
-                f.write("Statistics\n")
-                f.write("-" * 60 + "\n")
-                f.write(f"Total Words       : {stats['total_words']:,}\n")
-                f.write(f"Avg Message Length: {stats['avg_message_length']:.1f} words\n")
-                f.write(f"Original Messages : {stats['original_messages']:,}\n")
-                f.write(f"Replies           : {stats['replies']:,}\n")
-                
-                if stats['most_active_hour']:
-                    hour, count = stats['most_active_hour']
-                    f.write(f"Most Active Hour  : {hour}:00 ({count} messages)\n")
-                
-                if stats['most_active_day']:
-                    day, count = stats['most_active_day']
-                    f.write(f"Most Active Day   : {day} ({count} messages)\n")
+    def prepare_export_rows(self, user_id: str) -> List[Dict]:
+        rows = []
+        for msg in self.user_messages[user_id]:
+            rows.append({
+                'timestamp': msg['timestamp'],
+                'content': msg['content'],
+                'message_id': msg['message_id'],
+                'replied': self.get_reply_message(msg['reply_to_msg_id']) if msg['reply_to_msg_id'] else None,
+                'reply_chain': tuple(self.all_messages[chain_id] for chain_id in msg['reply_chain_ids'])
+            })
+        return rows
+    
+    @staticmethod
+    def export_txt(output_file: str, user_id: str, data: Dict, stats: Dict, rows: List[Dict]):
+        parts = []
+        append = parts.append
+        
+        append("=" * 60 + "\n")
+        append("Discord Message Archive\n")
+        append("=" * 60 + "\n")
+        append(f"User ID   : {user_id}\n")
+        append(f"Username  : {data['username']}\n")
+        append(f"Color     : {data['color']}\n")
+        append(f"Messages  : {data['message_count']:,}\n")
+        date_range = DiscordExtractor.format_date_range(data['first_timestamp'], data['last_timestamp'])
+        if date_range != "N/A":
+            append(f"Range     : {date_range}\n")
+        
+        if data['replied_to_users']:
+            append("\n" + "-" * 60 + "\n")
+            append("Reply Summary\n")
+            append("-" * 60 + "\n")
+            append(f"Replied to {len(data['replied_to_users'])} unique user(s):\n")
+            sorted_replies = sorted(data['replied_to_users'].items(), key=lambda x: x[1][1], reverse=True)
+            for uid, (uname, count) in sorted_replies[:10]:
+                append(f"  • {uname} (ID: {uid}): {count} time{'s' if count != 1 else ''}\n")
+        
+        if stats:
+            append("\n" + "-" * 60 + "\n")
+            append("Statistics\n")
+            append("-" * 60 + "\n")
+            append(f"Total Words       : {stats['total_words']:,}\n")
+            append(f"Avg Message Length: {stats['avg_message_length']:.1f} words\n")
+            append(f"Original Messages : {stats['original_messages']:,}\n")
+            append(f"Replies           : {stats['replies']:,}\n")
             
-            f.write("\n" + "=" * 60 + "\n\n")
+            if stats['most_active_hour']:
+                hour, count = stats['most_active_hour']
+                append(f"Most Active Hour  : {hour}:00 ({count} messages)\n")
             
-            for msg in data['messages']:
-                if msg['reply_chain_ids'] and len(msg['reply_chain_ids']) > 1:
-                    f.write("┌─ [CONTEXT CHAIN] " + "─" * 38 + "\n")
-                    for i, chain_msg_id in enumerate(reversed(msg['reply_chain_ids'])):
-                        chain_msg = self.all_messages[chain_msg_id]
-                        indent = "│ " + "  " * i
-                        f.write(f"{indent}[{chain_msg['timestamp']}] {chain_msg['username']} (ID: {chain_msg['user_id']}):\n")
-                        f.write(f"{indent}{chain_msg['content']}\n")
-                        if i < len(msg['reply_chain_ids']) - 1:
-                            f.write(f"{indent}↳\n")
-                    f.write("└" + "─" * 59 + "\n")
-                elif msg['reply_to_msg_id']:
-                    replied = self.get_reply_message(msg['reply_to_msg_id'])
-                    if replied:
-                        f.write("┌─ [CONTEXT] " + "─" * 47 + "\n")
-                        f.write(f"│ [{replied['timestamp']}] {replied['username']} (ID: {replied['user_id']}):\n")
-                        f.write(f"│ {replied['content']}\n")
-                        f.write("└" + "─" * 59 + "\n")
-                
-                f.write(f"[{msg['timestamp']}] {user_id}: {self.all_messages[msg['message_id']]['content']}\n\n")
+            if stats['most_active_day']:
+                day, count = stats['most_active_day']
+                append(f"Most Active Day   : {day} ({count} messages)\n")
+        
+        append("\n" + "=" * 60 + "\n\n")
+        
+        for row in rows:
+            chain = row['reply_chain']
+            replied = row['replied']
+            if len(chain) > 1:
+                append("┌─ [CONTEXT CHAIN] " + "─" * 38 + "\n")
+                for i, chain_msg in enumerate(reversed(chain)):
+                    indent = "│ " + "  " * i
+                    append(f"{indent}[{chain_msg.timestamp}] {chain_msg.username} (ID: {chain_msg.user_id}):\n")
+                    append(f"{indent}{chain_msg.content}\n")
+                    if i < len(chain) - 1:
+                        append(f"{indent}↳\n")
+                append("└" + "─" * 59 + "\n")
+            elif replied:
+                append("┌─ [CONTEXT] " + "─" * 47 + "\n")
+                append(f"│ [{replied.timestamp}] {replied.username} (ID: {replied.user_id}):\n")
+                append(f"│ {replied.content}\n")
+                append("└" + "─" * 59 + "\n")
+            
+            append(f"[{row['timestamp']}] {user_id}: {row['content']}\n\n")
+        
+        with open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+            f.write(''.join(parts))
     
-    def export_json(self, output_file: str, user_id: str):
-        data = self.user_data[user_id]
-        stats = self.statistics.get(user_id, {})
-        
+    @staticmethod
+    def export_json(output_file: str, user_id: str, data: Dict, stats: Dict, rows: List[Dict]):
         output = {
             'user_id': user_id,
             'username': data['username'],
             'color': data['color'],
-            'message_count': len(data['messages']),
+            'message_count': data['message_count'],
             'date_range': {
                 'first': data['first_timestamp'],
                 'last': data['last_timestamp']
@@ -451,256 +608,201 @@ class DiscordExtractor:
             'messages': []
         }
         
-        for msg in data['messages']:
+        for row in rows:
             msg_data = {
-                'timestamp': msg['timestamp'],
-                'content': self.all_messages[msg['message_id']]['content'],
-                'message_id': msg['message_id'],
-                'reply_chain_length': len(msg['reply_chain_ids'])
+                'timestamp': row['timestamp'],
+                'content': row['content'],
+                'message_id': row['message_id'],
+                'reply_chain_length': len(row['reply_chain'])
             }
             
-            if msg['reply_to_msg_id']:
-                replied = self.get_reply_message(msg['reply_to_msg_id'])
-                if replied:
-                    msg_data['reply_to'] = {
-                        'user_id': replied['user_id'],
-                        'username': replied['username'],
-                        'content': replied['content'],
-                        'timestamp': replied['timestamp']
-                    }
-                else:
-                    msg_data['reply_to'] = None
+            replied = row['replied']
+            if replied:
+                msg_data['reply_to'] = {
+                    'user_id': replied.user_id,
+                    'username': replied.username,
+                    'content': replied.content,
+                    'timestamp': replied.timestamp
+                }
             else:
                 msg_data['reply_to'] = None
             
             output['messages'].append(msg_data)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        if HAS_ORJSON:
+            with open(output_file, 'wb', buffering=WRITE_BUFFER) as f:
+                f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+                json.dump(output, f, indent=2, ensure_ascii=False)
     
-    def export_csv(self, output_file: str, user_id: str):
-        data = self.user_data[user_id]
+    @staticmethod
+    def export_csv(output_file: str, user_id: str, data: Dict, stats: Dict, rows: List[Dict]):
+        def csv_rows():
+            for row in rows:
+                replied = row['replied']
+                yield (
+                    row['timestamp'],
+                    user_id,
+                    data['username'],
+                    row['content'],
+                    replied.username if replied else '',
+                    replied.content if replied else '',
+                    row['message_id']
+                )
         
-        with open(output_file, 'w', newline='', encoding='utf-8') as f:
+        with open(output_file, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER) as f:
             writer = csv.writer(f)
             writer.writerow(['Timestamp', 'User ID', 'Username', 'Content', 'Reply To User', 'Reply To Content', 'Message ID'])
+            writer.writerows(csv_rows())
+    
+    @staticmethod
+    def export_markdown(output_file: str, user_id: str, data: Dict, stats: Dict, rows: List[Dict]):
+        parts = []
+        append = parts.append
+        
+        append(f"# Discord Message Archive\n\n")
+        append(f"## User Information\n\n")
+        append(f"- **User ID**: {user_id}\n")
+        append(f"- **Username**: {data['username']}\n")
+        append(f"- **Messages**: {data['message_count']:,}\n")
+        date_range = DiscordExtractor.format_date_range(data['first_timestamp'], data['last_timestamp'])
+        if date_range != "N/A":
+            append(f"- **Date Range**: {date_range}\n")
+        
+        if data['replied_to_users']:
+            append(f"\n## Reply Summary\n\n")
+            append(f"Replied to {len(data['replied_to_users'])} unique user(s):\n\n")
+            sorted_replies = sorted(data['replied_to_users'].items(), key=lambda x: x[1][1], reverse=True)
+            for uid, (uname, count) in sorted_replies[:10]:
+                append(f"- **{uname}** (ID: {uid}): {count} time{'s' if count != 1 else ''}\n")
+        
+        if stats:
+            append(f"\n## Statistics\n\n")
+            append(f"| Metric | Value |\n")
+            append(f"|--------|-------|\n")
+            append(f"| Total Words | {stats['total_words']:,} |\n")
+            append(f"| Avg Message Length | {stats['avg_message_length']:.1f} words |\n")
+            append(f"| Original Messages | {stats['original_messages']:,} |\n")
+            append(f"| Replies | {stats['replies']:,} |\n")
             
-            for msg in data['messages']:
-                replied = self.get_reply_message(msg['reply_to_msg_id']) if msg['reply_to_msg_id'] else None
-                writer.writerow([
-                    msg['timestamp'],
-                    user_id,
-                    data['username'],
-                    self.all_messages[msg['message_id']]['content'],
-                    replied['username'] if replied else '',
-                    replied['content'] if replied else '',
-                    msg['message_id']
-                ])
-    
-    def export_markdown(self, output_file: str, user_id: str):
-        data = self.user_data[user_id]
-        stats = self.statistics.get(user_id, {})
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(f"# Discord Message Archive\n\n")
-            f.write(f"## User Information\n\n")
-            f.write(f"- **User ID**: {user_id}\n")
-            f.write(f"- **Username**: {data['username']}\n")
-            f.write(f"- **Messages**: {len(data['messages']):,}\n")
-            date_range = self.format_date_range(data['first_timestamp'], data['last_timestamp'])
-            if date_range != "N/A":
-                f.write(f"- **Date Range**: {date_range}\n")
-            
-            if data['replied_to_users']:
-                f.write(f"\n## Reply Summary\n\n")
-                f.write(f"Replied to {len(data['replied_to_users'])} unique user(s):\n\n")
-                sorted_replies = sorted(data['replied_to_users'].items(), key=lambda x: x[1][1], reverse=True)
-                for uid, (uname, count) in sorted_replies[:10]:
-                    f.write(f"- **{uname}** (ID: {uid}): {count} time{'s' if count != 1 else ''}\n")
-            
-            if stats:
-                f.write(f"\n## Statistics\n\n")
-                f.write(f"| Metric | Value |\n")
-                f.write(f"|--------|-------|\n")
-                f.write(f"| Total Words | {stats['total_words']:,} |\n")
-                f.write(f"| Avg Message Length | {stats['avg_message_length']:.1f} words |\n")
-                f.write(f"| Original Messages | {stats['original_messages']:,} |\n")
-                f.write(f"| Replies | {stats['replies']:,} |\n")
-                
-                if stats['most_active_hour']:
-                    hour, count = stats['most_active_hour']
-                    f.write(f"| Most Active Hour | {hour}:00 ({count} messages) |\n")
-                
-                if stats['most_active_day']:
-                    day, count = stats['most_active_day']
-                    f.write(f"| Most Active Day | {day} ({count} messages) |\n")
+            if stats['most_active_hour']:
+                hour, count = stats['most_active_hour']
+                append(f"| Most Active Hour | {hour}:00 ({count} messages) |\n")
             
-            f.write(f"\n## Messages\n\n")
+            if stats['most_active_day']:
+                day, count = stats['most_active_day']
+                append(f"| Most Active Day | {day} ({count} messages) |\n")
+        
+        append(f"\n## Messages\n\n")
+        
+        for row in rows:
+            replied = row['replied']
+            if replied:
+                append(f"> **{replied.username}** ({replied.timestamp}):  \n")
+                append(f"> {replied.content}\n\n")
             
-            for msg in data['messages']:
-                if msg['reply_to_msg_id']:
-                    replied = self.get_reply_message(msg['reply_to_msg_id'])
-                    if replied:
-                        f.write(f"> **{replied['username']}** ({replied['timestamp']}):  \n")
-                        f.write(f"> {replied['content']}\n\n")
-                
-                f.write(f"**{data['username']}** ({msg['timestamp']}):  \n")
-                f.write(f"{self.all_messages[msg['message_id']]['content']}\n\n")
-                f.write("---\n\n")
-    
-    def export_html(self, output_file: str, user_id: str):
-        data = self.user_data[user_id]
-        stats = self.statistics.get(user_id, {})
+            append(f"**{data['username']}** ({row['timestamp']}):  \n")
+            append(f"{row['content']}\n\n")
+            append("---\n\n")
         
-        html_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <title>Discord Archive - {username}</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background-color: #36393f;
-            color: #dcddde;
-            padding: 20px;
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        .header {{
-            background-color: #2f3136;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-        }}
-        .stats {{
-            background-color: #2f3136;
-            padding: 20px;
-            border-radius: 8px;
-            margin-bottom: 20px;
-        }}
-        .message {{
-            background-color: #2f3136;
-            padding: 15px;
-            border-radius: 8px;
-            margin-bottom: 10px;
-            border-left: 3px solid {user_color};
-        }}
-        .context {{
-            background-color: #202225;
-            padding: 10px;
-            border-radius: 4px;
-            margin-bottom: 10px;
-            border-left: 2px solid #7289da;
-        }}
-        .timestamp {{
-            color: #72767d;
-            font-size: 0.9em;
-        }}
-        .username {{
-            color: {user_color};
-            font-weight: bold;
-        }}
-        h1, h2 {{
-            color: #fff;
-        }}
-        .stat-item {{
-            margin: 10px 0;
-        }}
-    </style>
-</head>
-<body>
-    <div class="header">
-        <h1>Discord Message Archive</h1>
-        <p><strong>User ID:</strong> {user_id}</p>
-        <p><strong>Username:</strong> {username}</p>
-        <p><strong>Messages:</strong> {message_count}</p>
-        <p><strong>Date Range:</strong> {date_range}</p>
-    </div>
-    
-    {stats_html}
+        with open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+            f.write(''.join(parts))
     
-    <h2>Messages</h2>
-    {messages_html}
-</body>
-</html>
-"""
-        
+    @staticmethod
+    def export_html(output_file: str, user_id: str, data: Dict, stats: Dict, rows: List[Dict]):
         stats_html = ""
         if stats:
-            stats_html = '<div class="stats"><h2>Statistics</h2>'
-            stats_html += f'<div class="stat-item"><strong>Total Words:</strong> {stats["total_words"]:,}</div>'
-            stats_html += f'<div class="stat-item"><strong>Avg Message Length:</strong> {stats["avg_message_length"]:.1f} words</div>'
-            stats_html += f'<div class="stat-item"><strong>Original Messages:</strong> {stats["original_messages"]:,}</div>'
-            stats_html += f'<div class="stat-item"><strong>Replies:</strong> {stats["replies"]:,}</div>'
+            stats_parts = ['<div class="stats"><h2>Statistics</h2>']
+            stats_parts.append(f'<div class="stat-item"><strong>Total Words:</strong> {stats["total_words"]:,}</div>')
+            stats_parts.append(f'<div class="stat-item"><strong>Avg Message Length:</strong> {stats["avg_message_length"]:.1f} words</div>')
+            stats_parts.append(f'<div class="stat-item"><strong>Original Messages:</strong> {stats["original_messages"]:,}</div>')
+            stats_parts.append(f'<div class="stat-item"><strong>Replies:</strong> {stats["replies"]:,}</div>')
             if stats['most_active_hour']:
                 hour, count = stats['most_active_hour']
-                stats_html += f'<div class="stat-item"><strong>Most Active Hour:</strong> {hour}:00 ({count} messages)</div>'
+                stats_parts.append(f'<div class="stat-item"><strong>Most Active Hour:</strong> {hour}:00 ({count} messages)</div>')
             if stats['most_active_day']:
                 day, count = stats['most_active_day']
-                stats_html += f'<div class="stat-item"><strong>Most Active Day:</strong> {day} ({count} messages)</div>'
-            stats_html += '</div>'
-        
-        messages_html = ""
-        for msg in data['messages']:
-            if msg['reply_to_msg_id']:
-                replied = self.get_reply_message(msg['reply_to_msg_id'])
-                if replied:
-                    messages_html += f'<div class="context">'
-                    messages_html += f'<span class="username">{html.escape(replied["username"])}</span> '
-                    messages_html += f'<span class="timestamp">{html.escape(replied["timestamp"])}</span><br>'
-                    messages_html += f'{html.escape(replied["content"])}'
-                    messages_html += '</div>'
-            
-            messages_html += '<div class="message">'
-            messages_html += f'<span class="username">{html.escape(data["username"])}</span> '
-            messages_html += f'<span class="timestamp">{html.escape(msg["timestamp"])}</span><br>'
-            messages_html += f'{html.escape(self.all_messages[msg["message_id"]]["content"])}'
-            messages_html += '</div>'
-        
-        html_output = html_template.format(
-            username=html.escape(data['username']),
+                stats_parts.append(f'<div class="stat-item"><strong>Most Active Day:</strong> {day} ({count} messages)</div>')
+            stats_parts.append('</div>')
+            stats_html = ''.join(stats_parts)
+        
+        esc_username = html.escape(data['username'])
+        
+        parts = [HTML_HEAD_TEMPLATE.format(
+            username=esc_username,
             user_id=html.escape(user_id),
             user_color=data['color'] or '#7289da',
-            message_count=f"{len(data['messages']):,}",
-            date_range=self.format_date_range(data['first_timestamp'], data['last_timestamp']),
-            stats_html=stats_html,
-            messages_html=messages_html
-        )
+            message_count=f"{data['message_count']:,}",
+            date_range=DiscordExtractor.format_date_range(data['first_timestamp'], data['last_timestamp']),
+            stats_html=stats_html
+        )]
+        append = parts.append
+        for row in rows:
+            replied = row['replied']
+            if replied:
+                append(
+                    f'<div class="context">'
+                    f'<span class="username">{cached_escape(replied.username)}</span> '
+                    f'<span class="timestamp">{html.escape(replied.timestamp)}</span><br>'
+                    f'{cached_escape(replied.content)}'
+                    f'</div>'
+                )
+            
+            append(
+                f'<div class="message">'
+                f'<span class="username">{esc_username}</span> '
+                f'<span class="timestamp">{html.escape(row["timestamp"])}</span><br>'
+                f'{html.escape(row["content"])}'
+                f'</div>'
+            )
+        append(HTML_TAIL)
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(html_output)
+        with open(output_file, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+            f.write(''.join(parts))
     
-    def run(self, output_formats: List[str], output_prefix: str):
+    def run(self, output_formats: List[str], output_prefix: str, jobs: int = 1):
         self.extract_all_messages()
-        self.filter_and_extract_users()
-        self.calculate_statistics()
+        self.build_user_data_and_stats()
         
         print(f"\nExporting results...")
+        tasks = []
         for user_id in self.target_user_ids:
             if user_id not in self.user_data:
                 print(f"⚠ No data found for user ID {user_id}")
                 continue
             
-            username = self.user_data[user_id]['username']
-            
-            export_methods = {
-                'txt': self.export_txt,
-                'json': self.export_json,
-                'csv': self.export_csv,
-                'md': self.export_markdown,
-                'html': self.export_html
-            }
-            
-            for fmt in output_formats:
-                if fmt in export_methods:
-                    output_file = self.get_output_path(output_prefix, username, user_id, fmt)
-                    export_methods[fmt](output_file, user_id)
+            data = self.user_data[user_id]
+            outputs = [(fmt, self.get_output_path(output_prefix, data['username'], user_id, fmt))
+                       for fmt in output_formats if fmt in EXPORT_METHODS]
+            tasks.append((user_id, outputs, data, self.statistics.get(user_id, {}), self.prepare_export_rows(user_id)))
+        
+        if jobs > 1 and len(tasks) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as executor:
+                futures = [executor.submit(export_user, *task) for task in tasks]
+                for future in futures:
+                    for fmt, output_file in future.result():
+                        print(f"✓ Exported {fmt.upper()}: {output_file}")
+        else:
+            for user_id, outputs, data, stats, rows in tasks:
+                for fmt, output_file in outputs:
+                    getattr(DiscordExtractor, EXPORT_METHODS[fmt])(output_file, user_id, data, stats, rows)
                     print(f"✓ Exported {fmt.upper()}: {output_file}")
         
         print("\n✅ All exports complete!")
 
 
+def export_user(user_id: str, outputs: List[Tuple[str, str]], data: Dict, stats: Dict, rows: List[Dict]) -> List[Tuple[str, str]]:
+    for fmt, output_file in outputs:
+        getattr(DiscordExtractor, EXPORT_METHODS[fmt])(output_file, user_id, data, stats, rows)
+    return outputs
+
+
+def comma_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Discord Message Extractor Pro - Extract and analyze Discord chat logs',
@@ -729,66 +831,108 @@ Examples:
     
     parser.add_argument('-i', '--input', required=True, help='Input HTML file from Discord chat export')
     parser.add_argument('-o', '--output', default='discord_export', help='Output file prefix (default: discord_export)')
-    parser.add_argument('-u', '--user-id', dest='user_id', help='Single target user ID to extract')
-    parser.add_argument('-U', '--user-ids', dest='user_ids', help='Multiple user IDs (comma-separated)')
-    parser.add_argument('-f', '--format', default='txt', help='Output format(s): txt,json,csv,md,html (comma-separated, default: txt)')
+    parser.add_argument('-u', '--user-id', dest='user_id', type=str.strip, help='Single target user ID to extract')
+    parser.add_argument('-U', '--user-ids', dest='user_ids', type=comma_list, default=[], help='Multiple user IDs (comma-separated)')
+    parser.add_argument('-f', '--format', type=comma_list, default='txt', help='Output format(s): txt,json,csv,md,html (comma-separated, default: txt)')
     parser.add_argument('--date-from', help='Filter messages from this date (format: MM/DD/YYYY)')
     parser.add_argument('--date-to', help='Filter messages until this date (format: MM/DD/YYYY)')
     parser.add_argument('-s', '--search', help='Search for messages containing this term')
     parser.add_argument('--exclude-replies', action='store_true', help='Exclude reply messages')
+    parser.add_argument('--strict-html', action='store_true', help='Match message boundaries with whitespace/case-tolerant regexes instead of exact DiscordChatExporter markup (slower)')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes for exporting (default: 1, sequential)')
     
     args = parser.parse_args()
     
-    if not os.path.exists(args.input):
+    try:
+        input_stat = os.stat(args.input)
+    except FileNotFoundError:
         print(f"❌ Error: Input file '{args.input}' not found")
         sys.exit(1)
+    except OSError as e:
+        print(f"❌ Error: Cannot access '{args.input}': {e.strerror}")
+        sys.exit(1)
+    
+    if not stat.S_ISREG(input_stat.st_mode):
+        print(f"❌ Error: Input '{args.input}' is not a regular file")
+        sys.exit(1)
+    
+    if not input_stat.st_size:
+        print(f"❌ Error: Input file '{args.input}' is empty")
+        sys.exit(1)
     
-    user_ids = []
-    if args.user_id:
-        user_ids.append(args.user_id)
-    if args.user_ids:
-        user_ids.extend(args.user_ids.split(','))
+    user_ids = list(dict.fromkeys(([args.user_id] if args.user_id else []) + args.user_ids))
     
     if not user_ids:
         print("❌ Error: At least one user ID must be specified (--user-id or --user-ids)")
         sys.exit(1)
     
-    user_ids = [uid.strip() for uid in user_ids]
+    if args.jobs < 1:
+        print("❌ Error: --jobs must be at least 1")
+        sys.exit(1)
+    
+    formats = list(dict.fromkeys(f.lower() for f in args.format))
+    if not formats:
+        print("❌ Error: At least one output format must be specified (--format)")
+        print(f"Valid formats: {', '.join(EXPORT_METHODS)}")
+        sys.exit(1)
     
-    formats = [f.strip().lower() for f in args.format.split(',')]
-    valid_formats = {'txt', 'json', 'csv', 'md', 'html'}
-    invalid = set(formats) - valid_formats
+    invalid = set(formats) - VALID_FORMATS
     if invalid:
         print(f"❌ Error: Invalid format(s): {', '.join(invalid)}")
-        print(f"Valid formats: {', '.join(valid_formats)}")
+        print(f"Valid formats: {', '.join(EXPORT_METHODS)}")
         sys.exit(1)
     
-    print("=" * 60)
-    print("Discord Message Extractor Pro")
-    print("=" * 60)
-    print(f"Input file: {args.input}")
-    print(f"Target user IDs: {', '.join(user_ids)}")
-    print(f"Output formats: {', '.join(formats)}")
+    date_from = None
+    if args.date_from:
+        date_from = DiscordExtractor.parse_date_bound(args.date_from)
+        if not date_from:
+            print(f"❌ Error: Invalid --date-from value '{args.date_from}' (expected MM/DD/YYYY)")
+            sys.exit(1)
+    
+    date_to = None
+    if args.date_to:
+        date_to = DiscordExtractor.parse_date_bound(args.date_to, end_of_day=True)
+        if not date_to:
+            print(f"❌ Error: Invalid --date-to value '{args.date_to}' (expected MM/DD/YYYY)")
+            sys.exit(1)
+    
+    banner = [
+        "=" * 60,
+        "Discord Message Extractor Pro",
+        "=" * 60,
+        f"Input file: {args.input}",
+        f"Target user IDs: {', '.join(user_ids)}",
+        f"Output formats: {', '.join(formats)}"
+    ]
     if args.date_from:
-        print(f"Date from: {args.date_from}")
+        banner.append(f"Date from: {args.date_from}")
     if args.date_to:
-        print(f"Date to: {args.date_to}")
+        banner.append(f"Date to: {args.date_to}")
     if args.search:
-        print(f"Search term: {args.search}")
+        banner.append(f"Search term: {args.search}")
     if args.exclude_replies:
-        print("Excluding reply messages")
-    print("=" * 60 + "\n")
+        banner.append("Excluding reply messages")
+    if args.strict_html:
+        banner.append("Strict HTML boundary matching enabled")
+    if args.jobs > 1 and len(user_ids) > 1:
+        banner.append(f"Export workers: {min(args.jobs, len(user_ids))}")
+    elif args.jobs > 1:
+        banner.append("Export workers: 1 (--jobs parallelizes across users; a single user exports sequentially)")
+    banner.append("=" * 60 + "\n")
+    sys.stdout.write("\n".join(banner) + "\n")
     
     extractor = DiscordExtractor(
         input_file=args.input,
         target_user_ids=user_ids,
-        date_from=args.date_from,
-        date_to=args.date_to,
+        date_from=date_from,
+        date_to=date_to,
         search_term=args.search,
-        exclude_replies=args.exclude_replies
+        exclude_replies=args.exclude_replies,
+        strict_html=args.strict_html,
+        input_size=input_stat.st_size
     )
     
-    extractor.run(formats, args.output)
+    extractor.run(formats, args.output, args.jobs)
 
 
 if __name__ == "__main__":